@@ -2,42 +2,75 @@ import json
 import os
 import sys
 from http.server import BaseHTTPRequestHandler
-from urllib.parse import urlparse, parse_qs
+from urllib.parse import urlparse, parse_qsl
 
 # Ensure project root is in sys.path for importing 'scripts'
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from scripts.daily_tweet import run_daily_tweet
 
+TIPS_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "content", "coding_tips.txt"))
+
+# orjson is optional; it encodes straight to UTF-8 bytes
+try:
+    import orjson  # type: ignore
+
+    _dumps = orjson.dumps
+except Exception:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
 
 class handler(BaseHTTPRequestHandler):
+    # Write status line, headers and body in one call; set TWEET_API_SINGLE_WRITE=0
+    # to go through send_response/send_header when debugging.
+    single_write = os.environ.get("TWEET_API_SINGLE_WRITE", "1") != "0"
+
     def do_GET(self):
-        query_params = parse_qs(urlparse(self.path).query)
+        # Blank values are dropped and the first value wins for repeated keys,
+        # as with parse_qs(...)[0]
+        params: dict = {}
+        for key, value in parse_qsl(urlparse(self.path).query):
+            params.setdefault(key, value)
 
         def get_bool(name: str, default: bool = False) -> bool:
-            raw = (query_params.get(name, [str(default).lower()])[0] or "").strip().lower()
+            raw = params.get(name, "").strip().lower()
+            if not raw:
+                return default
             return raw in ("1", "true", "yes", "on")
 
         dry_run = get_bool("dry_run", False)
         no_image = get_bool("no_image", False)
-        image_source = (query_params.get("image_source", ["google"])[0] or "google").strip()
-        image_query = (query_params.get("image_query", [""])[0] or "").strip()
-        news_topic = (query_params.get("news_topic", [""])[0] or "").strip()
-
-        tips_file = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "content", "coding_tips.txt"))
+        image_source = params.get("image_source", "").strip() or "google"
+        image_query = params.get("image_query", "").strip()
+        news_topic = params.get("news_topic", "").strip()
 
         result = run_daily_tweet(
             dry_run=dry_run,
             no_image=no_image,
-            tips_file=tips_file,
+            tips_file=TIPS_FILE,
             image_source=image_source,
             image_query=image_query,
             news_topic=news_topic,
         )
 
-        body_bytes = json.dumps(result, ensure_ascii=False).encode("utf-8")
+        body_bytes = _dumps(result)
         status_code = 200 if result.get("ok") else 500
 
+        if self.single_write:
+            head = (
+                f"{self.protocol_version} {status_code} {self.responses[status_code][0]}\r\n"
+                f"Server: {self.version_string()}\r\n"
+                f"Date: {self.date_time_string()}\r\n"
+                "Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body_bytes)}\r\n"
+                "\r\n"
+            ).encode("ascii")
+            self.log_request(status_code)
+            self.close_connection = True
+            self.wfile.write(head + body_bytes)
+            return
+
         self.send_response(status_code)
         self.send_header("Content-Type", "application/json; charset=utf-8")
         self.send_header("Content-Length", str(len(body_bytes)))
@@ -1,30 +1,42 @@
 #!/usr/bin/env python3
 import argparse
+import colorsys
 import datetime
+import functools
 import hashlib
+import io
 import os
 import random
+import shutil
 import sys
-from typing import List, Optional, Tuple
+from typing import TYPE_CHECKING, List, Optional, Tuple, Union
 
-# Pillow is optional for dry-run or no-image modes
-try:
-    from PIL import Image, ImageDraw, ImageFont  # type: ignore
-    PIL_AVAILABLE = True
-except Exception:
-    PIL_AVAILABLE = False
+# Pillow is imported lazily inside the image helpers so dry-run or
+# no-image invocations don't pay for loading them
+if TYPE_CHECKING:
+    import requests
+    from PIL import ImageDraw, ImageFont  # type: ignore
 
 
 def read_tips_from_file(file_path: str) -> List[str]:
-    if not os.path.exists(file_path):
+    if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
         return []
-    tips: List[str] = []
     with open(file_path, "r", encoding="utf-8") as f:
-        for line in f:
-            tip = line.strip()
-            if tip and not tip.startswith("#"):
-                tips.append(tip)
-    return tips
+        raw = f.read()
+    return [tip for tip in (line.strip() for line in raw.splitlines()) if tip and not tip.startswith("#")]
+
+
+@functools.lru_cache(maxsize=8)
+def _load_tips(abs_path: str, mtime: float) -> Tuple[str, ...]:
+    # Keyed by mtime so edits to the tips file invalidate the cached entry
+    return tuple(read_tips_from_file(abs_path))
+
+
+def load_tips(file_path: str) -> List[str]:
+    """Return tips from file_path (cached per mtime), or the built-in defaults."""
+    abs_path = os.path.abspath(file_path)
+    mtime = os.path.getmtime(abs_path) if os.path.exists(abs_path) else 0
+    return list(_load_tips(abs_path, mtime)) or get_default_tips()
 
 
 def get_default_tips() -> List[str]:
@@ -72,86 +84,113 @@ def get_default_tips() -> List[str]:
     ]
 
 
+@functools.lru_cache(maxsize=64)
+def _det_idx(total: int, iso: str) -> int:
+    # Use ISO date string to compute a stable hash per day
+    digest = hashlib.blake2b(iso.encode("ascii"), digest_size=8).digest()
+    value = int.from_bytes(digest, byteorder="big", signed=False)
+    return value % total
+
+
 def deterministic_index(total: int, date: Optional[datetime.date] = None) -> int:
     if total <= 0:
         return 0
     if date is None:
         date = datetime.date.today()
-    # Use ISO date string to compute a stable hash per day
-    date_str = date.isoformat().encode("utf-8")
-    digest = hashlib.sha256(date_str).digest()
-    value = int.from_bytes(digest[:8], byteorder="big", signed=False)
-    return value % total
+    return _det_idx(total, date.isoformat())
 
 
 def wrap_text(text: str, draw: "ImageDraw.ImageDraw", font: "ImageFont.ImageFont", max_width: int) -> List[str]:
     words = text.split()
     lines: List[str] = []
     current: List[str] = []
-    for word in words:
-        trial = (" ".join(current + [word])).strip()
-        bbox = draw.textbbox((0, 0), trial, font=font)
-        w = bbox[2] - bbox[0]
-        if w <= max_width or not current:
-            current.append(word)
-        else:
+    # Measure each word once and keep a running line width instead of
+    # re-measuring the whole trial line for every word.
+    widths = [font.getlength(word) for word in words]
+    space_w = font.getlength(" ")
+    cur_w = 0.0
+    for word, word_w in zip(words, widths):
+        if current and cur_w + space_w + word_w > max_width:
             lines.append(" ".join(current))
             current = [word]
+            cur_w = word_w
+        else:
+            cur_w += (space_w if current else 0) + word_w
+            current.append(word)
     if current:
         lines.append(" ".join(current))
     return lines
 
 
+def _hsl_to_rgb(h: int, s: float, l: float) -> Tuple[int, int, int]:
+    r, g, b = colorsys.hls_to_rgb(h / 360.0, l, s)
+    return int(r * 255), int(g * 255), int(b * 255)
+
+
+# Pastel-like colors; only a handful of hues are possible, so precompute them
+_BASE_HUES = [200, 220, 260, 300, 180, 160, 210]
+_PASTEL_LUT = {
+    hue: (_hsl_to_rgb(hue, 0.45, 0.60), _hsl_to_rgb((hue + 40) % 360, 0.45, 0.40))
+    for hue in _BASE_HUES
+}
+
+
 def pick_colors(seed: int) -> tuple:
-    random.seed(seed)
-    # Pastel-like colors
-    base_hues = [200, 220, 260, 300, 180, 160, 210]
-    hue = random.choice(base_hues)
-    def hsl_to_rgb(h, s, l):
-        import colorsys
-        return tuple(int(c * 255) for c in colorsys.hls_to_rgb(h / 360.0, l, s))
-    c1 = hsl_to_rgb(hue, 0.45, 0.60)
-    c2 = hsl_to_rgb((hue + 40) % 360, 0.45, 0.40)
-    return c1, c2
-
-
-def generate_image_with_text(text: str, output_path: str, seed: int) -> Optional[str]:
-    if not PIL_AVAILABLE:
+    # Local RNG so picking colors doesn't reseed the global random module
+    hue = random.Random(seed).choice(_BASE_HUES)
+    return _PASTEL_LUT[hue]
+
+
+FONT_PATHS = [
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/System/Library/Fonts/SFNS.ttf",
+]
+
+
+@functools.lru_cache(maxsize=1)
+def _resolve_fonts() -> Tuple["ImageFont.ImageFont", "ImageFont.ImageFont"]:
+    # Load (title, body) fonts with fallback; resolved once per process on first
+    # use rather than at import, so Pillow stays out of no-image runs
+    from PIL import ImageFont  # type: ignore
+
+    for path in FONT_PATHS:
+        if os.path.exists(path):
+            try:
+                return ImageFont.truetype(path, 56), ImageFont.truetype(path, 36)
+            except Exception:
+                continue
+    return ImageFont.load_default(), ImageFont.load_default()
+
+
+def generate_image_with_text(
+    text: str, output_path: str, seed: int, return_buffer: bool = False
+) -> Optional[Union[str, io.BytesIO]]:
+    """Render text onto a gradient card and save it as JPEG.
+
+    Returns output_path, or an in-memory JPEG buffer when return_buffer is set
+    (skips the disk write/read round-trip before uploading).
+    """
+    # Pillow is optional for dry-run or no-image modes
+    try:
+        from PIL import Image, ImageDraw  # type: ignore
+    except Exception:
         print("Pillow not available; skipping image generation.")
         return None
 
     width, height = 1200, 675  # 16:9, good for social sharing
-    img = Image.new("RGB", (width, height), color=(24, 26, 27))
-    draw = ImageDraw.Draw(img)
 
-    # Gradient background
+    # Gradient background: compute one pixel per row, then stretch the 1px
+    # column to full width in C instead of drawing a line per row
     color_top, color_bottom = pick_colors(seed)
+    column = bytearray()
     for y in range(height):
         ratio = y / (height - 1)
-        r = int(color_top[0] * (1 - ratio) + color_bottom[0] * ratio)
-        g = int(color_top[1] * (1 - ratio) + color_bottom[1] * ratio)
-        b = int(color_top[2] * (1 - ratio) + color_bottom[2] * ratio)
-        draw.line([(0, y), (width, y)], fill=(r, g, b))
-
-    # Load fonts with fallback
-    font_paths = [
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-        "/System/Library/Fonts/SFNS.ttf",
-    ]
-    title_font = None
-    body_font = None
-    for path in font_paths:
-        if os.path.exists(path):
-            try:
-                title_font = ImageFont.truetype(path, 56)
-                body_font = ImageFont.truetype(path, 36)
-                break
-            except Exception:
-                continue
-    if title_font is None:
-        title_font = ImageFont.load_default()
-        body_font = ImageFont.load_default()
+        column += bytes(int(top * (1 - ratio) + bottom * ratio) for top, bottom in zip(color_top, color_bottom))
+    img = Image.frombytes("RGB", (1, height), bytes(column)).resize((width, height), Image.NEAREST)
+    draw = ImageDraw.Draw(img)
+
+    title_font, body_font = _resolve_fonts()
 
     # Draw header "Code Tip"
     header = "Code Tip"
@@ -183,20 +222,29 @@ def generate_image_with_text(text: str, output_path: str, seed: int) -> Optional
     fh = bbox[3] - bbox[1]
     draw.text(((width - fw) // 2, height - fh - 40), footer, font=footer_font, fill=(230, 230, 230))
 
+    if return_buffer:
+        buf = io.BytesIO()
+        img.save(buf, format="JPEG", quality=92, optimize=False)
+        buf.seek(0)
+        return buf
+
     img.save(output_path, format="JPEG", quality=92)
     return output_path
 
 
+_MAX_TWEET_LEN = 280
+_HASHTAGS = "\n\n#coding #programming #devtips"
+_ALLOWED_TIP_LEN = _MAX_TWEET_LEN - len(_HASHTAGS)
+
+
 def build_tweet_text(tip: str) -> str:
-    hashtags = "\n\n#coding #programming #devtips"
-    max_len = 280
-    allowed_tip_len = max_len - len(hashtags)
-    if len(tip) > allowed_tip_len:
-        tip = tip[: max(0, allowed_tip_len - 1)].rstrip() + "…"
-    return f"{tip}{hashtags}"
+    if len(tip) <= _ALLOWED_TIP_LEN:
+        return tip + _HASHTAGS
+    return tip[: max(0, _ALLOWED_TIP_LEN - 1)].rstrip() + "…" + _HASHTAGS
 
 
-def post_to_twitter(status_text: str, media_path: Optional[str]) -> None:
+def post_to_twitter(status_text: str, media_path: Optional[Union[str, io.BytesIO]]) -> None:
+    """Post status_text, attaching media_path (a file path or an in-memory JPEG buffer) if given."""
     api_key = os.environ.get("TWITTER_API_KEY")
     api_secret = os.environ.get("TWITTER_API_SECRET")
     access_token = os.environ.get("TWITTER_ACCESS_TOKEN")
@@ -218,7 +266,10 @@ def post_to_twitter(status_text: str, media_path: Optional[str]) -> None:
     api = tweepy.API(auth)
 
     media_ids = None
-    if media_path:
+    if isinstance(media_path, io.BytesIO):
+        upload = api.media_upload(filename="daily_tweet.jpg", file=media_path)
+        media_ids = [upload.media_id]
+    elif media_path:
         upload = api.media_upload(media_path)
         media_ids = [upload.media_id]
 
@@ -227,6 +278,22 @@ def post_to_twitter(status_text: str, media_path: Optional[str]) -> None:
 
 # --- New helpers for Google Images and News ---
 
+@functools.lru_cache(maxsize=1)
+def _get_session() -> "requests.Session":
+    """Shared HTTP session so repeated fetches reuse pooled connections."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    retry = Retry(total=2, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504))
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry))
+    return session
+
+
+_IMAGE_EXTS = frozenset({"jpg", "jpeg", "png"})
+
+
 def fetch_image_from_google(query: str, output_path: str) -> Optional[str]:
     """Fetch an image via Google Custom Search JSON API and save to output_path.
     Requires env vars GOOGLE_API_KEY and GOOGLE_CSE_ID.
@@ -237,7 +304,7 @@ def fetch_image_from_google(query: str, output_path: str) -> Optional[str]:
         print("Google API not configured; skipping Google image fetch.")
         return None
 
-    import requests
+    session = _get_session()
 
     params = {
         "key": api_key,
@@ -252,7 +319,7 @@ def fetch_image_from_google(query: str, output_path: str) -> Optional[str]:
         params["rights"] = rights
 
     try:
-        resp = requests.get("https://www.googleapis.com/customsearch/v1", params=params, timeout=15)
+        resp = session.get("https://www.googleapis.com/customsearch/v1", params=params, timeout=15)
         resp.raise_for_status()
         data = resp.json()
         items = data.get("items") or []
@@ -262,7 +329,9 @@ def fetch_image_from_google(query: str, output_path: str) -> Optional[str]:
             link = item.get("link")
             if not link:
                 continue
-            if any(link.lower().endswith(ext) for ext in [".jpg", ".jpeg", ".png"]):
+            # Compare only the extension, ignoring any query string
+            ext = link.split("?", 1)[0].rsplit(".", 1)[-1].lower()
+            if ext in _IMAGE_EXTS:
                 candidates.append(link)
         if not candidates and items:
             candidates = [i.get("link") for i in items if i.get("link")]
@@ -271,10 +340,20 @@ def fetch_image_from_google(query: str, output_path: str) -> Optional[str]:
             return None
 
         image_url = candidates[0]
-        r = requests.get(image_url, timeout=20)
-        r.raise_for_status()
-        with open(output_path, "wb") as f:
-            f.write(r.content)
+        with session.get(image_url, timeout=20, stream=True) as r:
+            r.raise_for_status()
+            r.raw.decode_content = True
+            # Stream into a sibling temp file so a failed download never
+            # leaves a truncated image at output_path
+            tmp_path = output_path + ".part"
+            try:
+                with open(tmp_path, "wb") as f:
+                    shutil.copyfileobj(r.raw, f, length=64 * 1024)
+                os.replace(tmp_path, output_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
         return output_path
     except Exception as e:
         print(f"Failed to fetch Google image: {e}")
@@ -283,28 +362,33 @@ def fetch_image_from_google(query: str, output_path: str) -> Optional[str]:
 
 def fetch_top_news(topic: str) -> Optional[Tuple[str, str]]:
     """Fetch top news headline and link for a topic using Google News RSS (no API key required)."""
-    import requests
     import xml.etree.ElementTree as ET
     import urllib.parse as urlparse
 
     rss_url = f"https://news.google.com/rss/search?q={urlparse.quote(topic)}&hl=en-US&gl=US&ceid=US:en"
     try:
-        resp = requests.get(rss_url, timeout=15)
-        resp.raise_for_status()
-        root = ET.fromstring(resp.content)
-        # Find first item
-        channel = root.find("channel")
-        if channel is None:
-            return None
-        item = channel.find("item")
-        if item is None:
-            return None
-        title_el = item.find("title")
-        link_el = item.find("link")
-        if title_el is None or link_el is None:
+        title: Optional[str] = None
+        link: Optional[str] = None
+        with _get_session().get(rss_url, timeout=15, stream=True) as resp:
+            resp.raise_for_status()
+            resp.raw.decode_content = True
+            # Stream-parse and stop at the end of the first <item>; the feed
+            # carries ~100 items and only the top headline is used.
+            in_item = False
+            for event, elem in ET.iterparse(resp.raw, events=("start", "end")):
+                if event == "start":
+                    if elem.tag == "item":
+                        in_item = True
+                    continue
+                if elem.tag == "item":
+                    break
+                if in_item and elem.tag == "title" and title is None:
+                    title = elem.text or ""
+                elif in_item and elem.tag == "link" and link is None:
+                    link = elem.text or ""
+                elem.clear()
+        if title is None or link is None:
             return None
-        title = title_el.text or ""
-        link = link_el.text or ""
         # Google News links often redirect; prefer as-is
         return (title.strip(), link.strip())
     except Exception as e:
@@ -315,13 +399,12 @@ def fetch_top_news(topic: str) -> Optional[Tuple[str, str]]:
 def build_news_tweet(title: str, url: str, topic: str) -> str:
     """Compose a tweet containing a news headline and link within 280 chars."""
     base_hashtags = f"\n\n#news #{topic.lower().replace(' ', '')}"
-    max_len = 280
     # Reserve 25 chars for t.co shortened link + newline
     reserved = len(base_hashtags) + 25 + 1
-    allowed_title_len = max_len - reserved
-    text = title
-    if len(text) > allowed_title_len:
-        text = text[: max(0, allowed_title_len - 1)].rstrip() + "…"
+    allowed_title_len = _MAX_TWEET_LEN - reserved
+    if len(title) <= allowed_title_len:
+        return f"{title}\n{url}{base_hashtags}"
+    text = title[: max(0, allowed_title_len - 1)].rstrip() + "…"
     return f"{text}\n{url}{base_hashtags}"
 
 
@@ -334,8 +417,49 @@ def derive_image_query(preferred_query: Optional[str], news_title: Optional[str]
     return "technology"
 
 
+def _select_content(tips_file: str, news_topic: str) -> Tuple[str, str, int, Optional[str]]:
+    """Pick today's tweet content: a news headline for news_topic (already stripped), else a coding tip.
+
+    Returns (tweet_text, image_text, image_seed, news_title).
+    """
+    if news_topic:
+        news = fetch_top_news(news_topic)
+        if news:
+            news_title, news_url = news
+            tweet_text = build_news_tweet(news_title, news_url, news_topic)
+            return tweet_text, news_title, deterministic_index(1000), news_title
+        print("News fetch failed; falling back to coding tip.")
+        tips = load_tips(tips_file)
+        tip = tips[deterministic_index(len(tips))]
+        return build_tweet_text(tip), news_topic, deterministic_index(1000), None
+
+    tips = load_tips(tips_file)
+    idx = deterministic_index(len(tips))
+    tip = tips[idx]
+    return build_tweet_text(tip), tip, idx, None
+
+
+def _make_image(
+    image_source: str,
+    text: str,
+    seed: int,
+    query: str,
+    output_path: str,
+    return_buffer: bool = False,
+) -> Optional[Union[str, io.BytesIO]]:
+    """Fetch a Google image for query, or fall back to a generated image of text."""
+    if image_source == "google":
+        fetched = fetch_image_from_google(query, output_path)
+        if fetched:
+            print(f"Attached Google image for query: '{query}'.")
+            return fetched
+        print("Falling back to generated image.")
+    return generate_image_with_text(text, output_path, seed, return_buffer=return_buffer)
+
+
 # New: programmatic entry point for serverless usage
-# Returns a dict with keys: ok (bool), dry_run (bool), tweet_text (str), media_path (Optional[str]), error (Optional[str])
+# Returns a dict with keys: ok (bool), dry_run (bool), tweet_text (str), media_path (Optional[str]),
+# media (Optional[str]: the file path, or "in-memory" for images uploaded without touching disk), error (Optional[str])
 def run_daily_tweet(
     dry_run: bool = False,
     no_image: bool = False,
@@ -346,75 +470,28 @@ def run_daily_tweet(
 ) -> dict:
     if tips_file is None:
         tips_file = os.path.join(os.path.dirname(__file__), "..", "content", "coding_tips.txt")
+    news_topic = news_topic.strip()
 
-    # Select content: news or coding tip
-    tweet_text: str
-    news_title: Optional[str] = None
-    news_url: Optional[str] = None
+    tmp_dir = os.environ.get("RUNNER_TEMP") or "/tmp"
+    desired_output = os.path.join(tmp_dir, "daily_tweet.jpg")
+    want_image = not no_image and image_source != "none"
 
-    if news_topic.strip():
-        news = fetch_top_news(news_topic.strip())
-        if news:
-            news_title, news_url = news
-            tweet_text = build_news_tweet(news_title, news_url, news_topic.strip())
-        else:
-            # Fallback to coding tip
-            tips = read_tips_from_file(os.path.abspath(tips_file))
-            if not tips:
-                tips = get_default_tips()
-            idx = deterministic_index(len(tips))
-            tip = tips[idx]
-            tweet_text = build_tweet_text(tip)
-    else:
-        tips = read_tips_from_file(os.path.abspath(tips_file))
-        if not tips:
-            tips = get_default_tips()
-        idx = deterministic_index(len(tips))
-        tip = tips[idx]
-        tweet_text = build_tweet_text(tip)
+    # Select content: news or coding tip
+    tweet_text, image_text, image_seed, news_title = _select_content(tips_file, news_topic)
 
     # Determine media
-    media_path: Optional[str] = None
-    if not no_image and image_source != "none":
-        tmp_dir = os.environ.get("RUNNER_TEMP") or "/tmp"
-        desired_output = os.path.join(tmp_dir, "daily_tweet.jpg")
-
-        if image_source == "google":
-            candidate_tip: Optional[str] = None
-            if not news_topic.strip():
-                # Derive from tip text when not posting news
-                tips = read_tips_from_file(os.path.abspath(tips_file))
-                if not tips:
-                    tips = get_default_tips()
-                idx = deterministic_index(len(tips))
-                candidate_tip = tips[idx]
-            query = derive_image_query(image_query, news_title, news_topic.strip() or None, candidate_tip)
-            fetched = fetch_image_from_google(query, desired_output)
-            if fetched:
-                media_path = fetched
-            else:
-                if news_topic.strip():
-                    seed = deterministic_index(1000)
-                    media_path = generate_image_with_text(news_title or news_topic.strip(), desired_output, seed)
-                else:
-                    tips = read_tips_from_file(os.path.abspath(tips_file))
-                    if not tips:
-                        tips = get_default_tips()
-                    idx = deterministic_index(len(tips))
-                    tip = tips[idx]
-                    media_path = generate_image_with_text(tip, desired_output, idx)
-        else:
-            # generated image
-            if news_topic.strip():
-                seed = deterministic_index(1000)
-                media_path = generate_image_with_text(news_title or news_topic.strip(), desired_output, seed)
-            else:
-                tips = read_tips_from_file(os.path.abspath(tips_file))
-                if not tips:
-                    tips = get_default_tips()
-                idx = deterministic_index(len(tips))
-                tip = tips[idx]
-                media_path = generate_image_with_text(tip, desired_output, idx)
+    media: Optional[Union[str, io.BytesIO]] = None
+    if want_image:
+        query = derive_image_query(image_query, news_title, news_topic or None, image_text)
+        media = _make_image(
+            image_source, image_text, image_seed, query, desired_output,
+            return_buffer=not dry_run,
+        )
+
+    # In-memory images have no path to report; flag them so callers can tell
+    # an attached image apart from no image
+    media_path = media if isinstance(media, str) else None
+    media_info = "in-memory" if isinstance(media, io.BytesIO) else media_path
 
     if dry_run:
         return {
@@ -422,16 +499,18 @@ def run_daily_tweet(
             "dry_run": True,
             "tweet_text": tweet_text,
             "media_path": media_path,
+            "media": media_info,
         }
 
     try:
-        post_to_twitter(tweet_text, media_path)
+        post_to_twitter(tweet_text, media)
     except Exception as e:
         return {
             "ok": False,
             "dry_run": False,
             "tweet_text": tweet_text,
             "media_path": media_path,
+            "media": media_info,
             "error": str(e),
         }
 
@@ -440,6 +519,7 @@ def run_daily_tweet(
         "dry_run": False,
         "tweet_text": tweet_text,
         "media_path": media_path,
+        "media": media_info,
     }
 
 
@@ -453,92 +533,35 @@ def main() -> None:
     parser.add_argument("--image-query", default="", help="Query for fetching image when using --image-source google.")
     parser.add_argument("--news-topic", default="", help="If set, post news for this topic instead of a coding tip.")
     args = parser.parse_args()
+    news_topic = args.news_topic.strip()
 
-    # Select content: news or coding tip
-    tweet_text: str
+    tmp_dir = os.environ.get("RUNNER_TEMP") or "/tmp"
+    desired_output = os.path.join(tmp_dir, "daily_tweet.jpg")
+    want_image = not args.no_image and args.image_source != "none"
 
-    news_title: Optional[str] = None
-    news_url: Optional[str] = None
-
-    if args.news_topic.strip():
-        news = fetch_top_news(args.news_topic.strip())
-        if news:
-            news_title, news_url = news
-            tweet_text = build_news_tweet(news_title, news_url, args.news_topic.strip())
-        else:
-            print("News fetch failed; falling back to coding tip.")
-            tips = read_tips_from_file(os.path.abspath(args.tips_file))
-            if not tips:
-                tips = get_default_tips()
-            idx = deterministic_index(len(tips))
-            tip = tips[idx]
-            tweet_text = build_tweet_text(tip)
-    else:
-        tips = read_tips_from_file(os.path.abspath(args.tips_file))
-        if not tips:
-            tips = get_default_tips()
-        idx = deterministic_index(len(tips))
-        tip = tips[idx]
-        tweet_text = build_tweet_text(tip)
+    # Select content: news or coding tip
+    tweet_text, image_text, image_seed, news_title = _select_content(args.tips_file, news_topic)
 
     # Determine media
-    media_path = None
-    if not args.no_image and args.image_source != "none":
-        tmp_dir = os.environ.get("RUNNER_TEMP") or "/tmp"
-        desired_output = os.path.join(tmp_dir, "daily_tweet.jpg")
-
-        if args.image_source == "google":
-            # Derive query from provided query, news, or tip
-            candidate_tip = None
-            if not args.news_topic.strip():
-                # When not posting news, derive from tip text if available
-                # Re-read tips to obtain the same selected tip for query context
-                tips = read_tips_from_file(os.path.abspath(args.tips_file))
-                if not tips:
-                    tips = get_default_tips()
-                idx = deterministic_index(len(tips))
-                candidate_tip = tips[idx]
-            query = derive_image_query(args.image_query, news_title, args.news_topic.strip() or None, candidate_tip)
-            fetched = fetch_image_from_google(query, desired_output)
-            if fetched:
-                media_path = fetched
-                print(f"Attached Google image for query: '{query}'.")
-            else:
-                print("Falling back to generated image.")
-                if args.news_topic.strip():
-                    seed = deterministic_index(1000)
-                    media_path = generate_image_with_text(news_title or args.news_topic.strip(), desired_output, seed)
-                else:
-                    tips = read_tips_from_file(os.path.abspath(args.tips_file))
-                    if not tips:
-                        tips = get_default_tips()
-                    idx = deterministic_index(len(tips))
-                    tip = tips[idx]
-                    media_path = generate_image_with_text(tip, desired_output, idx)
-        else:
-            # generated image
-            if args.news_topic.strip():
-                seed = deterministic_index(1000)
-                media_path = generate_image_with_text(news_title or args.news_topic.strip(), desired_output, seed)
-            else:
-                tips = read_tips_from_file(os.path.abspath(args.tips_file))
-                if not tips:
-                    tips = get_default_tips()
-                idx = deterministic_index(len(tips))
-                tip = tips[idx]
-                media_path = generate_image_with_text(tip, desired_output, idx)
+    media: Optional[Union[str, io.BytesIO]] = None
+    if want_image:
+        query = derive_image_query(args.image_query, news_title, news_topic or None, image_text)
+        media = _make_image(
+            args.image_source, image_text, image_seed, query, desired_output,
+            return_buffer=not args.dry_run,
+        )
 
     if args.dry_run:
         print("[DRY RUN] Would post tweet:\n")
         print(tweet_text)
-        if media_path:
-            print(f"\n[DRY RUN] Image generated at: {media_path}")
+        if media:
+            print(f"\n[DRY RUN] Image generated at: {media}")
         else:
             print("\n[DRY RUN] No image attached.")
         return
 
     try:
-        post_to_twitter(tweet_text, media_path)
+        post_to_twitter(tweet_text, media)
     except Exception as e:
         print(f"Failed to post tweet: {e}", file=sys.stderr)
         sys.exit(1)